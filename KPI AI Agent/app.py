@@ -1,13 +1,48 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
-from src.data_pipeline import load_data
+from src.data_pipeline import load_quarter_data
 from src.eda import plot_kpi_distribution
-from src.ahp_module import create_criteria_comparison, AHPConfigError
+from src.ahp_module import create_criteria_comparison, AHPConfigError, DEFAULT_COMPARISONS
 
 st.set_page_config(page_title="Remote Fix KPI Analysis", layout="wide")
 
+@st.cache_data(show_spinner=False)
+def _describe(df: pd.DataFrame) -> pd.DataFrame:
+    """Summary statistics, recomputed only when the data changes."""
+    return df.describe()
+
+# Keyed on the schema only: the numeric columns do not depend on the values
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: lambda d: tuple((col, str(dtype)) for col, dtype in d.dtypes.items())}
+)
+def _numeric_columns(df: pd.DataFrame) -> list:
+    """Names of the numeric (non-boolean) columns in df."""
+    return [
+        col for col, dtype in zip(df.columns, df.dtypes.values)
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+@st.cache_data(show_spinner=False)
+def _overview(df: pd.DataFrame) -> pd.DataFrame:
+    """Count, mean, std, min and max of the numeric columns (no quantile sorts)."""
+    return df[_numeric_columns(df)].agg(["count", "mean", "std", "min", "max"])
+
+# Figures are shared objects, so they are cached as resources rather than copied
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _kpi_fig(kpi: str, q1: pd.DataFrame, q4: pd.DataFrame):
+    """KPI distribution figure, rebuilt only when the KPI or the data changes."""
+    fig = plot_kpi_distribution(q1, q4, kpi=kpi)
+    # Detach from pyplot so evicted figures can be garbage collected
+    plt.close(fig)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _ahp_report(items: tuple) -> str:
+    """AHP report text for a sorted tuple of (pair, value) slider judgements."""
+    return create_criteria_comparison(custom_weights=dict(items)).report()
+
 # SIDEBAR FOR FILE UPLOAD AND CONTROLS
 st.sidebar.header("Data & Configuration")
 data_q1 = st.sidebar.file_uploader("Upload Q1 Data (CSV)", type=["csv"])
@@ -16,15 +51,15 @@ data_q4 = st.sidebar.file_uploader("Upload Q4 Data (CSV)", type=["csv"])
 # Load default data if no files uploaded
 if not data_q1 or not data_q4:
     try:
-        q1_data = load_data("data/cases_Q1_current_year.csv")
-        q4_data = load_data("data/cases_Q4_2024.csv")
+        q1_data, q4_data = load_quarter_data(
+            "data/cases_Q1_current_year.csv", "data/cases_Q4_2024.csv"
+        )
     except Exception as e:
         st.error(f"Error loading default data: {str(e)}")
         st.stop()
 else:
     try:
-        q1_data = load_data(data_q1)
-        q4_data = load_data(data_q4)
+        q1_data, q4_data = load_quarter_data(data_q1, data_q4)
     except Exception as e:
         st.error(f"Error loading uploaded data: {str(e)}")
         st.stop()
@@ -35,11 +70,15 @@ tab1, tab2, tab3 = st.tabs(["Q1 Data", "Q4 Data", "Sample Data"])
 
 with tab1:
     st.subheader("Q1 Statistics")
-    st.dataframe(q1_data.describe(), use_container_width=True)
+    st.dataframe(_overview(q1_data), use_container_width=True)
+    if st.checkbox("Show full quantile summary", key="q1_quantiles"):
+        st.dataframe(_describe(q1_data), use_container_width=True)
 
 with tab2:
     st.subheader("Q4 Statistics")
-    st.dataframe(q4_data.describe(), use_container_width=True)
+    st.dataframe(_overview(q4_data), use_container_width=True)
+    if st.checkbox("Show full quantile summary", key="q4_quantiles"):
+        st.dataframe(_describe(q4_data), use_container_width=True)
 
 with tab3:
     st.subheader("Sample Data (Q1)")
@@ -49,11 +88,11 @@ with tab3:
 
 # KPI DISTRIBUTION PLOT
 st.header("KPI Distribution Comparison")
-numeric_cols = list(q1_data.select_dtypes(include="number").columns)
+numeric_cols = _numeric_columns(q1_data)
 selected_kpi = st.selectbox("Select KPI", numeric_cols, index=numeric_cols.index("resolution_time"))
 
 try:
-    fig = plot_kpi_distribution(q1_data, q4_data, kpi=selected_kpi)
+    fig = _kpi_fig(selected_kpi, q1_data, q4_data)
     st.pyplot(fig)
 except Exception as e:
     st.error(f"Plotting error: {str(e)}")
@@ -64,14 +103,9 @@ st.write("Adjust criteria importance using the sliders below:")
 
 # Generate dynamic sliders based on criteria pairs
 try:
-    # Get default criteria pairs from the AHP module
-    default_comparisons = create_criteria_comparison().comparisons
-    criteria_pairs = list(default_comparisons.keys())
-    
     slider_values = {}
-    for pair in criteria_pairs:
+    for pair, default in DEFAULT_COMPARISONS.items():
         label = f"{pair[0]} vs {pair[1]}"
-        default = default_comparisons[pair]
         slider = st.slider(
             label,
             1, 9,
@@ -81,25 +115,29 @@ try:
         )
         slider_values[pair] = slider
     
-    # Update custom weights
-    custom_weights = {pair: slider_values[pair] for pair in criteria_pairs}
-    
-    # Validate AHP consistency
+    # Validate AHP consistency (single solve with the slider judgements)
     try:
-        criteria = create_criteria_comparison(custom_weights=custom_weights)
-        if criteria.consistency_ratio > 0.1:
-            st.error(f"Consistency Ratio (CR={criteria.consistency_ratio:.2f}) exceeds 0.1. Adjust comparisons.")
+        # Re-solve only when the sliders moved, not on unrelated widget changes
+        ahp_key = tuple(sorted(slider_values.items()))
+        if st.session_state.get("_ahp_key") != ahp_key:
+            st.session_state["_ahp_criteria"] = create_criteria_comparison(custom_weights=slider_values)
+            st.session_state["_ahp_key"] = ahp_key
+        criteria = st.session_state["_ahp_criteria"]
+        # Read the solved values once; the render code below only uses these locals
+        cr, weights = criteria.consistency_ratio, criteria.weights
+        if cr > 0.1:
+            st.error(f"Consistency Ratio (CR={cr:.2f}) exceeds 0.1. Adjust comparisons.")
             st.stop()
         
         # Display results
         st.subheader("AHP Results")
-        st.markdown(f"**Consistency Ratio (CR):** {criteria.consistency_ratio:.2f} ✅ (CR < 0.1)")
+        st.markdown(f"**Consistency Ratio (CR):** {cr:.2f} ✅ (CR < 0.1)")
         st.write("Final Criteria Weights:")
-        st.json(criteria.weights)
+        st.json(weights)
         
         # Display detailed report
         if st.checkbox("Show Full Report"):
-            st.text(criteria.report())
+            st.text(_ahp_report(ahp_key))
             
     except AHPConfigError as e:
         st.error(f"AHP Error: {str(e)}")
@@ -1,11 +1,10 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
-from src.data_pipeline import load_data, load_data_powerbi
+from src.data_pipeline import load_quarter_data
+from src.data_pipeline_PBI import load_data_powerbi
 from src.eda import plot_kpi_distribution
-from src.ahp_module import create_criteria_comparison, AHPConfigError
-from src.powerbi import get_access_token  # Ensure this function exists in your module
+from src.ahp_module import create_criteria_comparison, AHPConfigError, DEFAULT_COMPARISONS
 
 st.set_page_config(
     page_title="Remote Fix KPI Analysis",
@@ -13,10 +12,41 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CACHE FOR CSV LOADING (Performance Optimization)
-@st.cache_data
-def load_cached_data(file_path):
-    return load_data(file_path)
+@st.cache_data(show_spinner=False)
+def _describe(df: pd.DataFrame) -> pd.DataFrame:
+    """Summary statistics, recomputed only when the data changes."""
+    return df.describe()
+
+# Keyed on the schema only: the numeric columns do not depend on the values
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: lambda d: tuple((col, str(dtype)) for col, dtype in d.dtypes.items())}
+)
+def _numeric_columns(df: pd.DataFrame) -> list:
+    """Names of the numeric (non-boolean) columns in df."""
+    return [
+        col for col, dtype in zip(df.columns, df.dtypes.values)
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+@st.cache_data(show_spinner=False)
+def _overview(df: pd.DataFrame) -> pd.DataFrame:
+    """Count, mean, std, min and max of the numeric columns (no quantile sorts)."""
+    return df[_numeric_columns(df)].agg(["count", "mean", "std", "min", "max"])
+
+# Figures are shared objects, so they are cached as resources rather than copied
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _kpi_fig(kpi: str, q1: pd.DataFrame, q4: pd.DataFrame):
+    """KPI distribution figure, rebuilt only when the KPI or the data changes."""
+    fig = plot_kpi_distribution(q1, q4, kpi=kpi)
+    # Detach from pyplot so evicted figures can be garbage collected
+    plt.close(fig)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _ahp_report(items: tuple) -> str:
+    """AHP report text for a sorted tuple of (pair, value) slider judgements."""
+    return create_criteria_comparison(custom_weights=dict(items)).report()
 
 # SIDEBAR SETUP
 st.sidebar.header("Data Source Configuration")
@@ -35,11 +65,9 @@ if "q4_data" not in st.session_state:
 
 # DATA LOADING LOGIC
 def load_csv_data():
-    """Load CSV files with caching for performance."""
+    """Load both CSV files in parallel (cached inside load_quarter_data)."""
     try:
-        q1_data = load_cached_data("data/cases_Q1_current_year.csv")
-        q4_data = load_cached_data("data/cases_Q4_2024.csv")
-        return q1_data, q4_data
+        return load_quarter_data("data/cases_Q1_current_year.csv", "data/cases_Q4_2024.csv")
     except Exception as e:
         st.error(f"Error loading CSV files: {str(e)}")
         return None, None
@@ -106,15 +134,19 @@ if q1_data is not None and q4_data is not None:
     
     with col1:
         st.subheader("Q1 Data Summary")
-        st.dataframe(q1_data.describe(), use_container_width=True)
+        st.dataframe(_overview(q1_data), use_container_width=True)
+        if st.checkbox("Show full quantile summary", key="q1_quantiles"):
+            st.dataframe(_describe(q1_data), use_container_width=True)
         
     with col2:
         st.subheader("Q4 Data Summary")
-        st.dataframe(q4_data.describe(), use_container_width=True)
+        st.dataframe(_overview(q4_data), use_container_width=True)
+        if st.checkbox("Show full quantile summary", key="q4_quantiles"):
+            st.dataframe(_describe(q4_data), use_container_width=True)
     
     # KPI SELECTION & PLOTTING
     st.header("📈 KPI Distribution Comparison")
-    numeric_cols = list(q1_data.select_dtypes(include="number").columns)
+    numeric_cols = _numeric_columns(q1_data)
     default_kpi = "resolution_time" if "resolution_time" in numeric_cols else numeric_cols[0]
     selected_kpi = st.selectbox(
         "Select KPI",
@@ -127,7 +159,7 @@ if q1_data is not None and q4_data is not None:
         st.error(f"⚠️ KPI '{selected_kpi}' not found in Q4 data. Select another KPI.")
     else:
         try:
-            fig = plot_kpi_distribution(q1_data, q4_data, kpi=selected_kpi)
+            fig = _kpi_fig(selected_kpi, q1_data, q4_data)
             st.pyplot(fig, use_container_width=True)
         except Exception as e:
             st.error(f"Error plotting KPI: {str(e)}")
@@ -137,15 +169,10 @@ if q1_data is not None and q4_data is not None:
     st.write("Adjust criteria importance using the sliders below:")
     
     try:
-        # Get default criteria comparisons dynamically
-        default_criteria = create_criteria_comparison()
-        criteria_pairs = list(default_criteria.comparisons.keys())
-        
         # Create sliders for each criteria pair
         slider_values = {}
-        for pair in criteria_pairs:
+        for pair, default_val in DEFAULT_COMPARISONS.items():
             label = f"{pair[0]} vs {pair[1]}"
-            default_val = default_criteria.comparisons[pair]
             slider = st.slider(
                 label,
                 1, 9,
@@ -155,13 +182,16 @@ if q1_data is not None and q4_data is not None:
             )
             slider_values[pair] = slider
         
-        # Update custom weights
-        custom_weights = {pair: slider_values[pair] for pair in criteria_pairs}
-        
-        # Validate AHP consistency
+        # Validate AHP consistency (single solve with the slider judgements)
         try:
-            criteria = create_criteria_comparison(custom_weights=custom_weights)
-            cr = criteria.consistency_ratio
+            # Re-solve only when the sliders moved, not on unrelated widget changes
+            ahp_key = tuple(sorted(slider_values.items()))
+            if st.session_state.get("_ahp_key") != ahp_key:
+                st.session_state["_ahp_criteria"] = create_criteria_comparison(custom_weights=slider_values)
+                st.session_state["_ahp_key"] = ahp_key
+            criteria = st.session_state["_ahp_criteria"]
+            # Read the solved values once; the render code below only uses these locals
+            cr, weights = criteria.consistency_ratio, criteria.weights
             
             if cr > 0.1:
                 st.error(f"⚠️ Consistency Ratio (CR={cr:.2f}) exceeds 0.1. Adjust comparisons.")
@@ -170,15 +200,15 @@ if q1_data is not None and q4_data is not None:
                 
                 # Display results with visualization
                 st.subheader("Final Criteria Weights")
-                weights = criteria.weights
                 fig_ahp, ax = plt.subplots(figsize=(10, 6))
-                sns.barplot(x=list(weights.keys()), y=list(weights.values()), ax=ax)
+                ax.bar(list(weights.keys()), list(weights.values()),
+                       color=plt.cm.tab10.colors[:len(weights)])
                 ax.set_title("Prioritized Criteria Weights")
                 ax.set_ylabel("Weight")
                 st.pyplot(fig_ahp)
                 
                 if st.checkbox("Show Full AHP Report"):
-                    st.text(criteria.report())
+                    st.text(_ahp_report(ahp_key))
                     
         except AHPConfigError as e:
             st.error(f"AHP Configuration Error: {str(e)}")
@@ -1,11 +1,44 @@
 import json
 import ahpy
-from typing import Dict, Any, Optional
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+# Default pairwise judgements for the criteria layer (Saaty 1-9 scale)
+DEFAULT_COMPARISONS: Dict[Tuple[str, str], int] = {
+    ("Case Complexity", "Staffing Levels"): 3,
+    ("Case Complexity", "Process Changes"): 5,
+    ("Case Complexity", "Technology Adjustments"): 7,
+    ("Staffing Levels", "Process Changes"): 3,
+    ("Staffing Levels", "Technology Adjustments"): 5,
+    ("Process Changes", "Technology Adjustments"): 3,
+}
+
+# Saaty's random consistency index, keyed by matrix size
+SAATY_RANDOM_INDEX: Dict[int, float] = {
+    3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49
+}
 
 class AHPConfigError(Exception):
     """Raised for invalid AHP configuration errors."""
     pass
 
+class CriteriaComparison(NamedTuple):
+    """Solved criteria comparison: judgements, priority weights and consistency."""
+    comparisons: Dict[Tuple[str, str], float]
+    weights: Dict[str, float]
+    consistency_ratio: float
+
+    def report(self) -> str:
+        """Format the weights and consistency ratio as plain text."""
+        lines = [
+            "Criteria",
+            f"Consistency Ratio: {self.consistency_ratio:.3f}",
+            "Weights:",
+        ]
+        lines.extend(f"  {name}: {weight:.3f}" for name, weight in self.weights.items())
+        return "\n".join(lines)
+
 class AHPHierarchy:
     """Represents an AHP hierarchy with criteria and alternatives."""
     
@@ -89,6 +122,72 @@ class AHPHierarchy:
         """Generate a comprehensive report of the AHP analysis."""
         return self.root.report()
     
+def solve_ahp(
+    pairs: Dict[Tuple[str, str], float], names: List[str]
+) -> Tuple[np.ndarray, float]:
+    """
+    Solve a pairwise comparison matrix for its priority vector.
+
+    Args:
+        pairs (dict): Judgements keyed by (row, column) element names.
+        names (list): Element names in matrix order.
+
+    Returns:
+        tuple: (normalized principal eigenvector, consistency ratio)
+    """
+    n = len(names)
+    if n > 2 and n not in SAATY_RANDOM_INDEX:
+        raise AHPConfigError(f"No random index available for {n} elements")
+
+    index = {name: i for i, name in enumerate(names)}
+    matrix = np.ones((n, n))
+    for (a, b), value in pairs.items():
+        if value <= 0:
+            raise AHPConfigError(f"Comparison {a} vs {b} must be positive, got {value}")
+        i, j = index[a], index[b]
+        matrix[i, j] = value
+        matrix[j, i] = 1.0 / value
+
+    eigenvalues, eigenvectors = np.linalg.eig(matrix)
+    idx = np.argmax(eigenvalues.real)
+    weights = np.abs(eigenvectors[:, idx].real)
+    weights /= weights.sum()
+
+    if n <= 2:
+        return weights, 0.0
+    consistency_index = (eigenvalues[idx].real - n) / (n - 1)
+    return weights, max(consistency_index / SAATY_RANDOM_INDEX[n], 0.0)
+
+@lru_cache(maxsize=256)
+def _cached_compare(items: Tuple[Tuple[Tuple[str, str], float], ...]) -> CriteriaComparison:
+    """Solve the criteria comparison for a sorted tuple of (pair, value) items."""
+    comparisons = dict(items)
+    names = list(dict.fromkeys(name for pair in comparisons for name in pair))
+    weights, cr = solve_ahp(comparisons, names)
+    ranked = sorted(zip(names, weights), key=lambda item: item[1], reverse=True)
+    return CriteriaComparison(
+        comparisons=comparisons,
+        weights={name: round(float(weight), 3) for name, weight in ranked},
+        consistency_ratio=round(float(cr), 3)
+    )
+
+def create_criteria_comparison(
+    custom_weights: Optional[Dict[Tuple[str, str], float]] = None
+) -> CriteriaComparison:
+    """
+    Create the criteria comparison, overriding defaults with custom judgements.
+
+    Results are memoized on the final comparisons, so repeated slider
+    positions reuse the already solved comparison.
+    """
+    comparisons = dict(DEFAULT_COMPARISONS)
+    if custom_weights:
+        unknown = set(custom_weights) - set(comparisons)
+        if unknown:
+            raise AHPConfigError(f"Unknown criteria pairs: {sorted(unknown)}")
+        comparisons.update(custom_weights)
+    return _cached_compare(tuple(sorted(comparisons.items())))
+
 def load_config(config_path: str) -> Dict[str, Any]:
     """Helper function to load AHP configuration."""
     try:
@@ -1,25 +1,131 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from pyarrow import csv as pacsv
+from pyarrow import feather
+from streamlit.runtime.uploaded_file_manager import UploadedFile
 
-def load_data(file_path, date_col='date', fillna_columns=None):
+# Parsed CSVs are kept here as uncompressed Feather files so they can be memory-mapped
+FEATHER_CACHE_DIR = ".feather_cache"
+
+# Uploaded files are keyed on their upload id and size so reruns skip hashing the bytes
+_UPLOAD_HASH_FUNCS = {UploadedFile: lambda f: (f.file_id, f.size)}
+
+def _parse_csv(source, usecols=None, dtypes=None) -> pa.Table:
+    """Multithreaded Arrow parse of a CSV path or file-like object."""
+    return pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=usecols or [],
+            column_types=dtypes or {},
+            timestamp_parsers=[pacsv.ISO8601, "%Y-%m-%d"]
+        )
+    )
+
+def _digest(text: str) -> str:
+    """Short, filename-safe hash of a cache key component."""
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+def _prune_feather_cache(path_prefix: str, version_prefix: str) -> None:
+    """Remove cached tables for older versions of the same CSV."""
+    for name in os.listdir(FEATHER_CACHE_DIR):
+        if name.startswith(path_prefix) and not name.startswith(version_prefix):
+            try:
+                os.remove(os.path.join(FEATHER_CACHE_DIR, name))
+            except OSError:
+                # Still open elsewhere (e.g. memory-mapped on Windows); retried on the next write
+                pass
+
+def _read_csv_table(source, usecols=None, dtypes=None) -> pa.Table:
+    """
+    Parse a CSV into an Arrow table, reusing a Feather copy for unchanged files.
+
+    Files on disk are keyed by absolute path, modification time, size and
+    the column selection, so an edited file is parsed again and the copies
+    of its previous versions are removed. Uploaded files are always parsed,
+    and a cache directory that cannot be written only disables the cache.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return _parse_csv(source, usecols, dtypes)
+
+    stat = os.stat(source)
+    columns = sorted((dtypes or {}).items(), key=lambda item: item[0])
+    path_prefix = _digest(os.path.abspath(source)) + "-"
+    version_prefix = f"{path_prefix}{_digest(f'{stat.st_mtime_ns}|{stat.st_size}')}-"
+    cache_path = os.path.join(
+        FEATHER_CACHE_DIR, f"{version_prefix}{_digest(f'{usecols}|{columns}')}.feather"
+    )
+    if os.path.exists(cache_path):
+        return feather.read_table(cache_path, memory_map=True)
+
+    table = _parse_csv(source, usecols, dtypes)
+    # Write then rename so a concurrent reader never sees a partial file
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(FEATHER_CACHE_DIR, exist_ok=True)
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, cache_path)
+        _prune_feather_cache(path_prefix, version_prefix)
+    except OSError:
+        # The cache is only a speed-up; a read-only or full disk must not fail the load
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return table
+
+@st.cache_data(show_spinner=False, ttl=None, hash_funcs=_UPLOAD_HASH_FUNCS)
+def load_data(file_path, date_col='date', fillna_columns=None, usecols=None, dtypes=None):
     """
     Loads a CSV file into a pandas DataFrame, parses the specified date column,
     and optionally fills missing values for specific columns.
 
+    Results are cached by Streamlit, so reruns with the same source return the
+    parsed DataFrame without reading the CSV again. Files on disk are also
+    cached as Feather under FEATHER_CACHE_DIR, so a fresh process memory-maps
+    the parsed table instead of re-parsing an unchanged CSV.
+
     Args:
-        file_path (str): Path to the CSV file.
+        file_path (str or UploadedFile): Path to the CSV file or an uploaded file.
         date_col (str, optional): Column name to parse as datetime. Defaults to 'date'.
         fillna_columns (list, optional): Columns to forward-fill missing values. Defaults to None (no filling).
+        usecols (list, optional): Columns to read; the date column is always included. Defaults to None (all columns).
+        dtypes (dict, optional): Column name to pyarrow type (or type name such as 'float32'). Defaults to None (inferred).
 
     Returns:
         pd.DataFrame: Processed DataFrame.
     """
+    if usecols is not None and date_col not in usecols:
+        usecols = [date_col, *usecols]
+
     try:
-        # Load data with error handling for invalid paths/columns
-        df = pd.read_csv(file_path, parse_dates=[date_col])
+        table = _read_csv_table(file_path, usecols, dtypes)
     except FileNotFoundError:
         raise ValueError(f"File not found: {file_path}")
-    except KeyError:
+    except KeyError as e:
+        # Raised by pyarrow when a requested column is not in the CSV
+        raise ValueError(str(e))
+
+    if date_col not in table.column_names:
         raise ValueError(f"Column '{date_col}' not found in the CSV")
+    # Columns stay Arrow-backed in pandas
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    # pyarrow yields date32/timestamp columns, which pandas does not treat as datetime64
+    date_dtype = df[date_col].dtype
+    if isinstance(date_dtype, pd.ArrowDtype) and pa.types.is_temporal(date_dtype.pyarrow_dtype):
+        df[date_col] = pd.to_datetime(df[date_col])
+    elif pd.api.types.is_string_dtype(date_dtype):
+        # pyarrow only parses ISO dates; let pandas infer other formats such as dd/mm/yyyy
+        try:
+            df[date_col] = pd.to_datetime(df[date_col])
+        except (ValueError, TypeError):
+            pass
 
     # Validate date parsing
     if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
@@ -27,15 +133,39 @@ def load_data(file_path, date_col='date', fillna_columns=None):
 
     # Handle missing values selectively
     if fillna_columns:
-        for col in fillna_columns:
-            if col not in df.columns:
-                raise ValueError(f"Column '{col}' not found in the DataFrame")
-            df[col] = df[col].fillna(method='ffill')
-            # Handle leading NaNs (replace with backward fill if possible)
-            df[col] = df[col].bfill()  # or fill with a default value
+        missing = [col for col in fillna_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Column '{missing[0]}' not found in the DataFrame")
+        # Forward-fill all requested columns in one pass; bfill handles leading NaNs
+        df[fillna_columns] = df[fillna_columns].ffill().bfill()
 
     return df
 
+@st.cache_data(show_spinner=False, hash_funcs=_UPLOAD_HASH_FUNCS)
+def load_quarter_data(q1_source, q4_source, date_col='date', fillna_columns=None,
+                      usecols=None, dtypes=None):
+    """
+    Loads the Q1 and Q4 sources concurrently with load_data.
+
+    The pyarrow reader releases the GIL while reading and parsing, so both
+    files are parsed in parallel on a cold start.
+
+    Args:
+        q1_source (str or UploadedFile): Q1 CSV path or uploaded file.
+        q4_source (str or UploadedFile): Q4 CSV path or uploaded file.
+        date_col (str, optional): Column name to parse as datetime. Defaults to 'date'.
+        fillna_columns (list, optional): Columns to forward-fill missing values. Defaults to None.
+        usecols (list, optional): Columns to read from both files. Defaults to None (all columns).
+        dtypes (dict, optional): Column name to pyarrow type for both files. Defaults to None.
+
+    Returns:
+        tuple: (q1_df, q4_df)
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        q1_future = executor.submit(load_data, q1_source, date_col, fillna_columns, usecols, dtypes)
+        q4_future = executor.submit(load_data, q4_source, date_col, fillna_columns, usecols, dtypes)
+        return q1_future.result(), q4_future.result()
+
 if __name__ == "__main__":
     try:
         # Test the data loader with explicit parameters
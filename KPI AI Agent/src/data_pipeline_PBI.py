@@ -1,9 +1,11 @@
 import pandas as pd
 from src.powerbi import load_data_from_powerbi
 
-def load_data(file_path, date_col='date', fillna_columns=None):
+def load_data(file_path, date_col='date', fillna_columns=None, usecols=None, dtypes=None):
+    if usecols is not None and date_col not in usecols:
+        usecols = [date_col, *usecols]
     try:
-        df = pd.read_csv(file_path, parse_dates=[date_col])
+        df = pd.read_csv(file_path, parse_dates=[date_col], usecols=usecols, dtype=dtypes)
     except FileNotFoundError:
         raise ValueError(f"File not found: {file_path}")
     except KeyError:
@@ -15,13 +17,11 @@ def load_data(file_path, date_col='date', fillna_columns=None):
 
     # Handle missing values selectively
     if fillna_columns:
-        for col in fillna_columns:
-            if col not in df.columns:
-                raise ValueError(f"Column '{col}' not found in the DataFrame")
-            # Forward-fill and handle leading NaNs with backward-fill
-            df[col] = df[col].fillna(method='ffill')
-            df[col] = df[col].fillna(method='bfill')  # Handle leading NaNs
-            # Alternatively, fill with default values like mean/median
+        missing = [col for col in fillna_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Column '{missing[0]}' not found in the DataFrame")
+        # Forward-fill and handle leading NaNs with backward-fill in one pass
+        df[fillna_columns] = df[fillna_columns].ffill().bfill()
 
     return df
 
@@ -42,7 +42,8 @@ def load_data_powerbi(source_config, date_col='date', fillna_columns=None):
 
     # Parse date column
     if date_col in df.columns:
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        # Power BI serializes dates as ISO 8601; an explicit format skips per-value inference
+        df[date_col] = pd.to_datetime(df[date_col], format='ISO8601', errors='coerce', cache=True)
         if df[date_col].isnull().all():
             raise ValueError(f"Column '{date_col}' could not be parsed as datetime")
     else:
@@ -50,10 +51,10 @@ def load_data_powerbi(source_config, date_col='date', fillna_columns=None):
 
     # Handle missing values selectively
     if fillna_columns:
-        for col in fillna_columns:
-            if col not in df.columns:
-                raise ValueError(f"Column '{col}' not found in the DataFrame")
-            df[col] = df[col].fillna(method='ffill').fillna(method='bfill')
+        missing = [col for col in fillna_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Column '{missing[0]}' not found in the DataFrame")
+        df[fillna_columns] = df[fillna_columns].ffill().bfill()
 
     return df
 
@@ -1,48 +1,221 @@
+import warnings
+import numpy as np
 import pandas as pd
-import seaborn as sns
+import streamlit as st
 import matplotlib.pyplot as plt
-from pandas_profiling import ProfileReport
+from joblib import Parallel, delayed
 
-def generate_eda_report(df, title="EDA Report", explorative=True, minimal=False):
+# Both quarters' KDEs are evaluated on one shared grid of this many points
+_KDE_GRID_POINTS = 512
+
+def generate_eda_report(df, title="EDA Report", explorative=False, minimal=True,
+                        correlations=None, interactions=None):
+    """
+    Build a ydata-profiling report and write it to ``<title>.html``.
+
+    Minimal mode is the default because correlations and interactions grow
+    quadratically with the number of columns. Explorative mode (which turns
+    minimal mode off) computes only Pearson correlations and skips
+    continuous interactions unless overridden.
+
+    Args:
+        df (pd.DataFrame): Data to profile.
+        title (str): Report title and output file name. Defaults to "EDA Report".
+        explorative (bool): Enable explorative mode. Defaults to False.
+        minimal (bool): Use ydata-profiling's minimal mode. Defaults to True.
+        correlations (dict, optional): Overrides the correlations config.
+        interactions (dict, optional): Overrides the interactions config.
+
+    Returns:
+        ProfileReport: The generated profile.
+    """
     if df.empty:
         raise ValueError("DataFrame is empty")
     
-    if minimal:
-        explorative = False  # Minimal mode overrides explorative
+    if explorative:
+        minimal = False  # Explicit explorative request overrides the minimal default
+        if correlations is None:
+            correlations = {
+                "auto": {"calculate": False},
+                "pearson": {"calculate": True},
+                "spearman": {"calculate": False},
+                "kendall": {"calculate": False},
+                "phi_k": {"calculate": False},
+                "cramers": {"calculate": False},
+            }
+        if interactions is None:
+            interactions = {"continuous": False}
+    
+    overrides = {}
+    if correlations is not None:
+        overrides["correlations"] = correlations
+    if interactions is not None:
+        overrides["interactions"] = interactions
     
+    # Imported here: ydata_profiling is slow to import and only needed for reports
+    from ydata_profiling import ProfileReport
+
     profile = ProfileReport(
         df,
         title=title,
         explorative=explorative,
         minimal=minimal,
-        progress_bar=False  # Disable for cleaner output
+        samples={"head": 0, "tail": 0},  # Skip row snippets in the HTML
+        progress_bar=False,  # Disable for cleaner output
+        **overrides
     )
     profile.to_file(f"{title}.html")
     return profile
     
-def plot_kpi_distribution(q1_df, q4_df, kpi='resolution_time'):
-if kpi not in q1_df.columns or kpi not in q4_df.columns:
+@st.cache_data(show_spinner=False)
+def _hist(vals: np.ndarray, bins=50):
+    """Density-normalized histogram, cached so reruns skip re-binning."""
+    return np.histogram(vals, bins=bins, density=True)
+
+def _kpi_values(q1_df, q4_df, kpi):
+    """Validate a KPI column and return its non-null Q1 and Q4 values as float arrays."""
+    if kpi not in q1_df.columns or kpi not in q4_df.columns:
         raise ValueError(f"Column '{kpi}' not found in one of the DataFrames")
     if not pd.api.types.is_numeric_dtype(q1_df[kpi]):
-        raise TypeError(f"Column '{kpi}' must be numeric for KDE plot")
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Plot KDEs
-    sns.kdeplot(q1_df[kpi], shade=True, ax=ax, label='Q1 This Year')
-    sns.kdeplot(q4_df[kpi], shade=True, ax=ax, label='Q4 2024')
-    
+        raise TypeError(f"Column '{kpi}' must be numeric for distribution plot")
+
+    q1_vals = q1_df[kpi].dropna().to_numpy(dtype=np.float64)
+    q4_vals = q4_df[kpi].dropna().to_numpy(dtype=np.float64)
+    if not q1_vals.size or not q4_vals.size:
+        raise ValueError(f"Column '{kpi}' has no values in one of the DataFrames")
+    return q1_vals, q4_vals
+
+def _has_spread(vals: np.ndarray) -> bool:
+    """Whether vals can support a KDE (at least two distinct values)."""
+    return vals.size >= 2 and np.ptp(vals) > 0
+
+def _kde(vals: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Gaussian KDE of vals evaluated on grid (runs in a joblib worker).
+
+    A constant or single-value sample has a singular covariance, so a zero
+    curve is returned instead, as seaborn did when skipping such data.
+    """
+    if not _has_spread(vals):
+        warnings.warn("Dataset has 0 variance; skipping density estimate.")
+        return np.zeros_like(grid)
+    # Imported here: scipy is slow to import and only the KDE path needs it
+    from scipy.stats import gaussian_kde
+
+    return gaussian_kde(vals, bw_method='scott')(grid)
+
+def plot_kpi_distribution(q1_df, q4_df, kpi='resolution_time', bins=50, kde=False, ax=None):
+    """
+    Plot the Q1 and Q4 distributions of a KPI as overlaid histograms or KDEs.
+
+    Both quarters share the same bin edges (or, with ``kde``, the same
+    evaluation grid) so their densities are directly comparable.
+
+    Args:
+        q1_df (pd.DataFrame): Q1 data.
+        q4_df (pd.DataFrame): Q4 data.
+        kpi (str): Numeric column to plot. Defaults to 'resolution_time'.
+        bins (int): Number of histogram bins. Defaults to 50.
+        kde (bool): Draw Gaussian KDE curves instead of histograms. Defaults to False.
+        ax (matplotlib.axes.Axes, optional): Axes to clear and redraw on, so repeated
+            calls reuse one figure. Defaults to None (new figure).
+
+    Returns:
+        matplotlib.figure.Figure: The comparison plot.
+    """
+    q1_vals, q4_vals = _kpi_values(q1_df, q4_df, kpi)
+
+    # Shared range across both quarters
+    lo = min(q1_vals.min(), q4_vals.min())
+    hi = max(q1_vals.max(), q4_vals.max())
+
+    # Create figure, or redraw on the caller's axes
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    else:
+        fig = ax.figure
+        ax.clear()
+
+    series = ((q1_vals, 'Q1 This Year'), (q4_vals, 'Q4 2024'))
+    if kde:
+        grid = np.linspace(lo, hi, _KDE_GRID_POINTS)
+        for vals, label in series:
+            ax.fill_between(grid, _kde(vals, grid), alpha=0.4, label=label)
+    else:
+        edges = np.histogram_bin_edges(q1_vals, bins=bins, range=(lo, hi))
+        for vals, label in series:
+            counts, _ = _hist(vals, bins=edges)
+            ax.stairs(counts, edges, fill=True, alpha=0.5, label=label)
+
     # Formatting
     ax.set_title(f"Distribution of {kpi.title()} Comparison", fontsize=14)
     ax.set_xlabel(f"{kpi.title()} (Unit)", fontsize=12)  # Customize unit as needed
     ax.set_ylabel("Density", fontsize=12)
     ax.legend(fontsize=12)
     ax.grid(True, linestyle='--', alpha=0.7)
-    
+
+    return fig
+
+def plot_kpi_distributions(q1_df, q4_df, kpis, n_jobs=-1):
+    """
+    Plot Q1 vs Q4 KDEs for several KPIs, one subplot per KPI.
+
+    The KDE evaluations are independent and CPU-bound, so they run in
+    parallel worker processes; only the resulting arrays come back, and all
+    drawing happens on the calling thread (matplotlib is not thread-safe).
+
+    Args:
+        q1_df (pd.DataFrame): Q1 data.
+        q4_df (pd.DataFrame): Q4 data.
+        kpis (list): Numeric columns to plot.
+        n_jobs (int): Worker processes for joblib. Defaults to -1 (all cores).
+
+    Returns:
+        matplotlib.figure.Figure: One row of axes per KPI.
+    """
+    if not kpis:
+        raise ValueError("At least one KPI is required")
+
+    jobs = []
+    for kpi in kpis:
+        q1_vals, q4_vals = _kpi_values(q1_df, q4_df, kpi)
+        grid = np.linspace(
+            min(q1_vals.min(), q4_vals.min()),
+            max(q1_vals.max(), q4_vals.max()),
+            _KDE_GRID_POINTS
+        )
+        jobs.append((kpi, grid, q1_vals, q4_vals))
+
+    # Constant samples get a zero curve here, so one such KPI neither reaches
+    # gaussian_kde nor has its warning lost inside a worker process
+    samples = [(grid, vals) for _, grid, q1_vals, q4_vals in jobs for vals in (q1_vals, q4_vals)]
+    fitted = iter(Parallel(n_jobs=n_jobs, backend='loky')(
+        delayed(_kde)(vals, grid) for grid, vals in samples if _has_spread(vals)
+    ))
+    densities = []
+    for grid, vals in samples:
+        if _has_spread(vals):
+            densities.append(next(fitted))
+        else:
+            warnings.warn("Dataset has 0 variance; skipping density estimate.")
+            densities.append(np.zeros_like(grid))
+
+    fig, axes = plt.subplots(len(jobs), 1, figsize=(10, 4 * len(jobs)), squeeze=False)
+    for i, ((kpi, grid, _, _), ax) in enumerate(zip(jobs, axes[:, 0])):
+        ax.fill_between(grid, densities[2 * i], alpha=0.4, label='Q1 This Year')
+        ax.fill_between(grid, densities[2 * i + 1], alpha=0.4, label='Q4 2024')
+        ax.set_title(f"Distribution of {kpi.title()} Comparison", fontsize=14)
+        ax.set_xlabel(f"{kpi.title()} (Unit)", fontsize=12)
+        ax.set_ylabel("Density", fontsize=12)
+        ax.legend(fontsize=12)
+        ax.grid(True, linestyle='--', alpha=0.7)
+    fig.tight_layout()
+
     return fig
 
 if __name__ == '__main__':
+    from src.data_pipeline import load_data  # pyarrow-backed CSV loader
+
     try:
         # Use the improved load_data function
         q1 = load_data(
@@ -1,44 +1,150 @@
-import requests
+import orjson
 import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import HTTPError
+from src.powerbi_session import build_session
 
-def load_data_from_powerbi(dataset_id, table_name, access_token, top=1000):
+# Shared session so keep-alive connections are reused across Power BI calls
+_SESSION = build_session()
+
+def _rows_to_table(rows):
+    """
+    Build an Arrow table from JSON row dicts.
+
+    A struct array takes the union of keys across all rows, so columns
+    missing from the first row are kept.
+    """
+    # Table.from_struct_array needs pyarrow>=15; go through a RecordBatch instead
+    return pa.Table.from_batches([pa.RecordBatch.from_struct_array(pa.array(rows))])
+
+def _iter_rows(dataset_id, table_name, access_token, page_size=10_000, top=None):
+    """
+    Yield table rows page by page as Arrow tables.
+
+    Follows ``@odata.nextLink`` when the service returns one and otherwise
+    advances ``$skip``, stopping on a short page or once ``top`` rows are read.
+    """
+    base_url = (
+        f"https://api.powerbi.com/v1.0/myorg/datasets/{dataset_id}/"
+        f"tables/{table_name}/rows"
+    )
+    headers = {"Authorization": f"Bearer {access_token}"}
+    fetched = 0
+    next_link = None
+
+    while top is None or fetched < top:
+        size = page_size if top is None else min(page_size, top - fetched)
+        url = next_link or f"{base_url}?$top={size}&$skip={fetched}"
+        response = _SESSION.get(url, headers=headers)
+        response.raise_for_status()
+
+        # orjson parses the raw body straight from bytes, much faster than response.json()
+        data = orjson.loads(response.content)
+        rows = data.get("value", [])
+        if top is not None:
+            rows = rows[:top - fetched]
+        if not rows:
+            return
+        # Only one page of decoded JSON is held at a time
+        yield _rows_to_table(rows)
+        fetched += len(rows)
+
+        next_link = data.get("@odata.nextLink")
+        if not next_link and len(rows) < size:
+            return
+
+def load_data_from_powerbi(dataset_id, table_name, access_token, top=1000, page_size=10_000):
     """
     Fetch data from a Power BI dataset using the Power BI Data Access API.
+
+    Rows are requested in pages of ``page_size`` and combined into a single
+    Arrow-backed DataFrame.
     
     Args:
         dataset_id (str): Power BI dataset ID.
         table_name (str): Table name in the dataset.
         access_token (str): OAuth Bearer token for authentication.
-        top (int): Maximum number of rows to retrieve (default=1000).
+        top (int): Maximum number of rows to retrieve; None for all rows (default=1000).
+        page_size (int): Rows requested per call (default=10_000).
         
     Returns:
         pd.DataFrame: Fetched data.
     """
-    # Construct the API URL for Data Access API
-    api_url = (
-        f"https://api.powerbi.com/v1.0/myorg/datasets/{dataset_id}/"
-        f"tables/{table_name}/rows?$top={top}"
-    )
-    
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
+    try:
+        pages = list(_iter_rows(dataset_id, table_name, access_token, page_size, top))
+    except HTTPError as http_err:
+        print(f"HTTP error occurred: {http_err}")
+        print(f"Response content: {http_err.response.text}")
+        raise
+    except Exception as err:
+        print(f"Other error occurred: {err}")
+        raise
+
+    if not pages:
+        return pd.DataFrame()
+    # Pages may disagree on a column's type (all nulls, or int64 vs double)
+    table = pa.concat_tables(pages, promote_options="permissive")
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def _post_queries(dataset_id, dax_queries, access_token):
+    """Run one executeQueries call and return a DataFrame per query."""
+    api_url = f"https://api.powerbi.com/v1.0/myorg/datasets/{dataset_id}/executeQueries"
+    headers = {"Authorization": f"Bearer {access_token}"}
+    body = {
+        "queries": [{"query": query} for query in dax_queries],
+        "serializerSettings": {"includeNulls": False}
     }
+    response = _SESSION.post(api_url, headers=headers, json=body)
+    response.raise_for_status()
+
+    frames = []
+    for result in orjson.loads(response.content).get("results", []):
+        if "error" in result:
+            raise ValueError(f"Query failed: {result['error']}")
+        rows = result["tables"][0].get("rows", [])
+        if not rows:
+            frames.append(pd.DataFrame())
+            continue
+        # With includeNulls off, rows omit null columns, so build from the union of keys
+        table = _rows_to_table(rows)
+        frames.append(table.to_pandas(types_mapper=pd.ArrowDtype))
+    return frames
+
+def execute_queries(dataset_id, dax_queries, access_token, max_queries_per_request=1, max_workers=4):
+    """
+    Run DAX queries (e.g. "EVALUATE 'Table'") against a dataset.
+
+    The executeQueries endpoint currently accepts a single query per call, so
+    queries are sent in batches of ``max_queries_per_request`` with up to
+    ``max_workers`` calls in flight on the shared session.
     
-    try:
-        response = requests.get(api_url, headers=headers)
-        response.raise_for_status()
+    Args:
+        dataset_id (str): Power BI dataset ID.
+        dax_queries (list): DAX query strings.
+        access_token (str): OAuth Bearer token for authentication.
+        max_queries_per_request (int): Queries per executeQueries call (default=1).
+        max_workers (int): Maximum concurrent calls (default=4).
         
-        data = response.json()
-        # Extract data rows (structure may vary; adjust based on actual response)
-        rows = data.get("value", [])
-        df = pd.DataFrame(rows)
-        return df
+    Returns:
+        list: One pd.DataFrame per query, in order. Columns are named 'Table[Column]'.
+    """
+    batches = [
+        dax_queries[i:i + max_queries_per_request]
+        for i in range(0, len(dax_queries), max_queries_per_request)
+    ]
+    if not batches:
+        return []
 
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            results = executor.map(
+                lambda batch: _post_queries(dataset_id, batch, access_token), batches
+            )
+            return [frame for frames in results for frame in frames]
     except HTTPError as http_err:
         print(f"HTTP error occurred: {http_err}")
-        print(f"Response content: {response.text}")
+        print(f"Response content: {http_err.response.text}")
         raise
     except Exception as err:
         print(f"Other error occurred: {err}")
@@ -1,11 +1,37 @@
 import os
+import sys
+import time
+import argparse
 import logging
+import shelve
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Optional
 from dotenv import load_dotenv
+from src.powerbi_session import build_session
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Power BI credentials, read from the environment once at import."""
+    client_id: Optional[str]
+    client_secret: Optional[str]
+    tenant_id: Optional[str]
+    group_id: Optional[str]
+
+
+_CFG = _Config(
+    client_id=os.getenv("CLIENT_ID"),
+    client_secret=os.getenv("CLIENT_SECRET"),
+    tenant_id=os.getenv("TENANT_ID"),
+    group_id=os.getenv("GROUP_ID"),
+)
+
 # Configure logging with a custom format
 logging.basicConfig(
     level=logging.INFO,
@@ -17,21 +43,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared session so keep-alive connections are reused across Power BI calls
+_SESSION = build_session()
+
+# Access tokens keyed by (tenant_id, client_id) -> (token, monotonic expiry)
+_TOKEN_CACHE: dict = {}
+_TOKEN_LOCK = threading.Lock()
+# Refresh this many seconds before the token actually expires
+_TOKEN_EXPIRY_MARGIN = 60
+
+# GET responses that carry an ETag are stored here and revalidated with If-None-Match
+ETAG_CACHE_PATH = ".powerbi_cache"
+_ETAG_LOCK = threading.Lock()
+
 
 def validate_environment_variables():
-    """Check that all required environment variables are present."""
-    required_vars = [
-        "CLIENT_ID",
-        "CLIENT_SECRET",
-        "TENANT_ID",
-        "GROUP_ID",
+    """Check that all required environment variables were present at import."""
+    missing_vars = [
+        field.name.upper() for field in fields(_CFG) if not getattr(_CFG, field.name)
     ]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
     if missing_vars:
         raise EnvironmentError(f"Missing environment variables: {', '.join(missing_vars)}")
     logger.info("All required environment variables are present.")
 
 
+def _etag_key(url: str, params=None) -> str:
+    """Cache key for a GET request, scoped to the configured client."""
+    query = sorted((params or {}).items())
+    return f"{_CFG.tenant_id}|{_CFG.client_id}|{url}|{query}"
+
+
+def _etag_lookup(key: str):
+    """Return the cached (etag, body) pair for a key, or None."""
+    with _ETAG_LOCK, shelve.open(ETAG_CACHE_PATH) as cache:
+        return cache.get(key)
+
+
+def _etag_store(key: str, etag: str, body: dict) -> None:
+    """Remember a response body together with its ETag."""
+    with _ETAG_LOCK, shelve.open(ETAG_CACHE_PATH) as cache:
+        cache[key] = (etag, body)
+
+
 def make_powerbi_request(url: str, method: str, headers=None, params=None, json_data=None, token=None) -> dict:
     """
     Makes a Power BI API request with proper error handling.
@@ -46,18 +99,34 @@ def make_powerbi_request(url: str, method: str, headers=None, params=None, json_
 
     Returns:
         dict: JSON response from the API.
+
+    GET responses with an ETag are cached on disk under ETAG_CACHE_PATH; later
+    calls send If-None-Match and reuse the cached body on 304 Not Modified.
     """
-    headers = headers or {"Authorization": f"Bearer {token}"}
+    headers = dict(headers or {"Authorization": f"Bearer {token}"})
+    method = method.upper()
+    cache_key = cached = None
+    if method == "GET":
+        cache_key = _etag_key(url, params)
+        cached = _etag_lookup(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
     try:
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=json_data)
+        if method == "GET":
+            response = _SESSION.get(url, headers=headers, params=params)
+        elif method == "POST":
+            response = _SESSION.post(url, headers=headers, json=json_data)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
         
+        if cached and response.status_code == 304:
+            return cached[1]
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if cache_key and etag:
+            _etag_store(cache_key, etag, data)
+        return data
     except requests.exceptions.HTTPError as e:
         logger.error("HTTP Error %s: %s", response.status_code, e)
         raise
@@ -67,33 +136,46 @@ def make_powerbi_request(url: str, method: str, headers=None, params=None, json_
 
 
 def get_access_token() -> str:
-    """Obtain an OAuth2 access token using the client credentials flow."""
-    client_id = os.getenv("CLIENT_ID")
-    client_secret = os.getenv("CLIENT_SECRET")
-    tenant_id = os.getenv("TENANT_ID")
+    """
+    Obtain an OAuth2 access token using the client credentials flow.
+
+    Tokens are cached per tenant and client until shortly before they expire,
+    so repeated calls do not round-trip to the token endpoint.
+    """
+    cache_key = (_CFG.tenant_id, _CFG.client_id)
     
-    token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
+    token_url = f"https://login.microsoftonline.com/{_CFG.tenant_id}/oauth2/v2.0/token"
     payload = {
         "grant_type": "client_credentials",
-        "client_id": client_id,
-        "client_secret": client_secret,
+        "client_id": _CFG.client_id,
+        "client_secret": _CFG.client_secret,
         "scope": "https://analysis.windows.net/powerbi/api/.default"
     }
     
-    try:
-        response = requests.post(token_url, data=payload)
-        response.raise_for_status()
-        token_data = response.json()
-        if "access_token" not in token_data:
-            raise KeyError("Access token not found in response.")
-        logger.info("Access token obtained successfully.")
-        return token_data["access_token"]
-    except requests.exceptions.HTTPError as e:
-        logger.error("Failed to retrieve access token: %s", e)
-        raise
-    except KeyError as e:
-        logger.error("Invalid token response format: %s", e)
-        raise
+    # Held across the request so concurrent callers share a single refresh
+    with _TOKEN_LOCK:
+        cached = _TOKEN_CACHE.get(cache_key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        
+        try:
+            response = _SESSION.post(token_url, data=payload)
+            response.raise_for_status()
+            token_data = response.json()
+            if "access_token" not in token_data:
+                raise KeyError("Access token not found in response.")
+            logger.info("Access token obtained successfully.")
+        except requests.exceptions.HTTPError as e:
+            logger.error("Failed to retrieve access token: %s", e)
+            raise
+        except KeyError as e:
+            logger.error("Invalid token response format: %s", e)
+            raise
+        
+        token = token_data["access_token"]
+        expires_in = int(token_data.get("expires_in", 3599))
+        _TOKEN_CACHE[cache_key] = (token, time.monotonic() + expires_in - _TOKEN_EXPIRY_MARGIN)
+        return token
 
 
 def get_reports(group_id: str, token: str) -> dict:
@@ -108,6 +190,29 @@ def get_tables(dataset_id: str, token: str) -> dict:
     return make_powerbi_request(url, "GET", token=token)
 
 
+def get_tables_for_datasets(dataset_ids: list, token: str, max_workers: int = 8) -> dict:
+    """
+    Retrieve tables for several Power BI datasets concurrently.
+
+    Requests share the pooled session, so wall time is roughly one round-trip
+    per batch of ``max_workers`` datasets instead of one per dataset.
+
+    Args:
+        dataset_ids (list): Dataset IDs; duplicates are fetched once.
+        token (str): OAuth2 access token.
+        max_workers (int): Maximum concurrent requests (default=8).
+
+    Returns:
+        dict: Dataset ID mapped to its tables response.
+    """
+    unique_ids = list(dict.fromkeys(dataset_ids))
+    if not unique_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_ids))) as executor:
+        responses = executor.map(lambda dataset_id: get_tables(dataset_id, token), unique_ids)
+        return dict(zip(unique_ids, responses))
+
+
 def display_reports(reports: list) -> None:
     """Display reports in a user-friendly numbered list."""
     logger.info("Available Reports:")
@@ -121,8 +226,19 @@ def display_reports(reports: list) -> None:
         )
 
 
-def select_report(reports: list) -> dict:
-    """Prompt the user to select a report by its index."""
+def select_report(reports: list, index: Optional[int] = None) -> dict:
+    """
+    Select a report by its 1-based index.
+
+    Prompts the user only when no index is given and stdin is a terminal, so
+    the script can also run unattended.
+    """
+    if index is not None:
+        if not 1 <= index <= len(reports):
+            raise ValueError(f"Report index {index} is out of range (1-{len(reports)})")
+        return reports[index - 1]
+    if not sys.stdin.isatty():
+        raise ValueError("No report selected; pass --report-index or set POWERBI_REPORT_INDEX")
     while True:
         try:
             selection = int(input("Enter the number of the report to inspect: "))
@@ -134,37 +250,68 @@ def select_report(reports: list) -> dict:
             logger.warning("Invalid input. Please enter a number.")
 
 
-def main():
+def display_tables(tables: list, heading: str = "Tables in the dataset:") -> None:
+    """Log the table names of a dataset."""
+    logger.info(heading)
+    for table in tables:
+        logger.info("Table Name: %s", table.get("name", "N/A"))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line options for report selection."""
+    parser = argparse.ArgumentParser(description="List the tables behind Power BI reports.")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--report-index",
+        type=int,
+        default=os.getenv("POWERBI_REPORT_INDEX"),
+        help="1-based index of the report to inspect (default: $POWERBI_REPORT_INDEX, else prompt)"
+    )
+    selection.add_argument(
+        "--all",
+        action="store_true",
+        help="List the tables of every report, fetched concurrently"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     try:
         # Validate environment variables
         validate_environment_variables()
         
-        # Retrieve environment variables
-        group_id = os.getenv("GROUP_ID")
-        
         # Get access token
         token = get_access_token()
         
         # Get reports from the workspace
-        reports_response = get_reports(group_id, token)
+        reports_response = get_reports(_CFG.group_id, token)
         reports = reports_response.get("value", [])
         if not reports:
             logger.error("No reports found in the workspace.")
             return
         
-        # Display reports and let the user select one
         display_reports(reports)
-        selected_report = select_report(reports)
+        
+        if args.all:
+            # Fetch every report's tables at once instead of one report per run
+            dataset_ids = [r["datasetId"] for r in reports if r.get("datasetId")]
+            tables_by_dataset = get_tables_for_datasets(dataset_ids, token)
+            for report in reports:
+                tables_response = tables_by_dataset.get(report.get("datasetId"), {})
+                display_tables(
+                    tables_response.get("value", []),
+                    f"Tables in report '{report.get('name', 'N/A')}':"
+                )
+            return
+        
+        # Select a report from the CLI/environment or let the user pick one
+        selected_report = select_report(reports, args.report_index)
         dataset_id = selected_report.get("datasetId")
         
         # Get tables from the selected dataset
         tables_response = get_tables(dataset_id, token)
-        tables = tables_response.get("value", [])
-        
-        # Display tables
-        logger.info("Tables in the dataset:")
-        for table in tables:
-            logger.info("Table Name: %s", table.get("name", "N/A"))
+        display_tables(tables_response.get("value", []))
         
     except EnvironmentError as e:
         logger.error("Environment configuration error: %s", e)
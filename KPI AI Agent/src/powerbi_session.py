@@ -0,0 +1,28 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_session() -> requests.Session:
+    """
+    Create a pooled requests session for the Power BI REST API.
+
+    Keep-alive connections are reused across calls, and throttled (429) or
+    failed (5xx) responses are retried with backoff, honouring Retry-After.
+    """
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            # The only POSTs are OAuth token requests and executeQueries reads, both safe to repeat
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True,
+            raise_on_status=False  # Hand the last response back so raise_for_status() reports it
+        )
+    ))
+    return session